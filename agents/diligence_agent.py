@@ -1,24 +1,37 @@
 import os
-from openai import AsyncOpenAI
+import asyncio
 from typing import Dict, Any
 import json
 from datetime import datetime
 from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, LongTable, TableStyle, ListFlowable, ListItem
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 
+from utils.llm_cache import cached_chat
+from utils.openai_client import shared_openai
+
 class DiligenceAgent:
     def __init__(self):
-        self.openai_client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self.openai_client = shared_openai
         self.styles = getSampleStyleSheet()
+        # Build custom styles once instead of per report
+        self.title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=self.styles['Heading1'],
+            fontSize=20,
+            spaceAfter=30,
+        )
     
     async def generate_report(self, company_data, research_data: Dict[str, Any], web3_analysis: Dict[str, Any]) -> Dict[str, Any]:
         """Generate comprehensive diligence report"""
         
+        # Single wall-clock reading shared by the report body and the PDF name
+        now = datetime.now()
+
         report_data = {
             "company_name": company_data.company_name,
-            "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "generated_at": now.strftime("%Y-%m-%d %H:%M:%S"),
             "executive_summary": "",
             "investment_recommendation": "",
             "key_findings": [],
@@ -32,36 +45,42 @@ class DiligenceAgent:
             }
         }
         
-        # Generate executive summary
-        report_data["executive_summary"] = await self._generate_executive_summary(
-            company_data, research_data, web3_analysis
-        )
-        
-        # Generate structured findings
-        structured_analysis = await self._generate_structured_analysis(
-            company_data, research_data, web3_analysis
+        # Serialize the shared prompt context once in compact form - both
+        # prompts truncate to 1500 chars anyway, so indent=2 was pure waste
+        research_ctx = json.dumps(research_data, separators=(",", ":"))[:1500]
+        web3_ctx = json.dumps(web3_analysis, separators=(",", ":"))[:1500]
+
+        # Executive summary and combined scoring/findings are independent
+        # GPT-4 calls - run them concurrently
+        summary, combined = await asyncio.gather(
+            self._generate_executive_summary(company_data, research_ctx, web3_ctx),
+            self._generate_combined_analysis(company_data, research_ctx, web3_ctx)
         )
-        
-        report_data.update(structured_analysis)
+
+        report_data["executive_summary"] = summary
+        framework_score = combined.pop("framework_score", None)
+        if framework_score:
+            report_data["scoring"] = framework_score
+        report_data.update(combined)
         
         # Generate PDF report
-        pdf_path = await self._generate_pdf_report(report_data)
+        pdf_path = await self._generate_pdf_report(report_data, now)
         report_data["pdf_path"] = pdf_path
         
         return report_data
     
-    async def _generate_executive_summary(self, company_data, research_data: Dict[str, Any], web3_analysis: Dict[str, Any]) -> str:
+    async def _generate_executive_summary(self, company_data, research_ctx: str, web3_ctx: str) -> str:
         """Generate executive summary using AI"""
-        
+
         summary_prompt = f"""
         Generate a concise executive summary (3-4 paragraphs) for this investment opportunity:
-        
+
         Company: {company_data.company_name}
         Website: {company_data.website}
         Industry: {company_data.industry}
-        
-        Research Summary: {json.dumps(research_data, indent=2)[:1500]}
-        Web3 Analysis: {json.dumps(web3_analysis, indent=2)[:1500]}
+
+        Research Summary: {research_ctx}
+        Web3 Analysis: {web3_ctx}
         
         Include:
         1. What the company does
@@ -74,30 +93,51 @@ class DiligenceAgent:
         """
         
         try:
-            response = await self.openai_client.chat.completions.create(
+            return await cached_chat(
+                self.openai_client,
                 model="gpt-4",
                 messages=[{"role": "user", "content": summary_prompt}],
                 temperature=0.2,
-                max_tokens=800
+                max_tokens=800,
+                stream=True
             )
             
-            return response.choices[0].message.content
-            
         except Exception as e:
             return f"Executive summary generation failed: {str(e)}"
     
-    async def _generate_structured_analysis(self, company_data, research_data: Dict[str, Any], web3_analysis: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate structured analysis components"""
-        
+    async def _generate_combined_analysis(self, company_data, research_ctx: str, web3_ctx: str) -> Dict[str, Any]:
+        """Generate framework scoring and structured findings in one call"""
+
         analysis_prompt = f"""
         Based on the research data, provide structured analysis for investment decision:
-        
+
         Company: {company_data.company_name}
-        Research: {json.dumps(research_data, indent=2)[:1500]}
-        Web3 Analysis: {json.dumps(web3_analysis, indent=2)[:1500]}
-        
+        Research: {research_ctx}
+        Web3 Analysis: {web3_ctx}
+
+        Score these areas (1-10):
+        1. Team Quality & Experience
+        2. Technology Innovation
+        3. Market Opportunity Size
+        4. Tokenomics & Business Model
+        5. Traction & Community
+        6. Regulatory Risk (10 = low risk)
+        7. Competitive Position
+        8. Investment Fit (our thesis alignment)
+
         Provide JSON response with:
         {{
+            "framework_score": {{
+                "team_score": 0,
+                "tech_score": 0,
+                "market_score": 0,
+                "tokenomics_score": 0,
+                "traction_score": 0,
+                "regulatory_score": 0,
+                "competitive_score": 0,
+                "fit_score": 0,
+                "overall_score": 0
+            }},
             "investment_recommendation": "Go/No-Go/Monitor",
             "key_findings": [
                 "Finding 1",
@@ -120,17 +160,19 @@ class DiligenceAgent:
             ]
         }}
         """
-        
+
         try:
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4",
+            content = await cached_chat(
+                self.openai_client,
+                model="gpt-4-1106-preview",
                 messages=[{"role": "user", "content": analysis_prompt}],
                 temperature=0.1,
-                max_tokens=1000
+                max_tokens=1500,
+                response_format={"type": "json_object"}
             )
-            
-            return json.loads(response.choices[0].message.content)
-            
+
+            return json.loads(content)
+
         except Exception as e:
             return {
                 "investment_recommendation": "Monitor",
@@ -139,29 +181,33 @@ class DiligenceAgent:
                 "opportunities": ["Unable to assess opportunities due to analysis error"],
                 "next_steps": ["Manual review required"]
             }
-    
-    async def _generate_pdf_report(self, report_data: Dict[str, Any]) -> str:
+
+    def _bullet_list(self, items) -> ListFlowable:
+        """Build a bullet list as one flowable instead of N paragraphs"""
+        return ListFlowable(
+            [ListItem(Paragraph(str(item), self.styles['Normal'])) for item in items],
+            bulletType='bullet'
+        )
+
+    async def _generate_pdf_report(self, report_data: Dict[str, Any], timestamp: datetime) -> str:
         """Generate PDF report"""
         try:
             # Create reports directory if it doesn't exist
             os.makedirs("reports", exist_ok=True)
             
-            filename = f"reports/{report_data['company_name'].replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf"
-            
-            doc = SimpleDocTemplate(filename, pagesize=letter, 
-                                  rightMargin=72, leftMargin=72, 
+            filename = f"reports/{report_data['company_name'].replace(' ', '_')}_{timestamp.strftime('%Y%m%d_%H%M')}.pdf"
+
+            # Render to a temp path and move into place atomically, so the
+            # email sender never picks up a half-written PDF
+            tmp_path = filename + ".tmp"
+            doc = SimpleDocTemplate(tmp_path, pagesize=letter,
+                                  rightMargin=72, leftMargin=72,
                                   topMargin=72, bottomMargin=18)
             
             story = []
             
             # Title
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=self.styles['Heading1'],
-                fontSize=20,
-                spaceAfter=30,
-            )
-            story.append(Paragraph(f"Investment Diligence Report", title_style))
+            story.append(Paragraph(f"Investment Diligence Report", self.title_style))
             story.append(Paragraph(f"<b>{report_data['company_name']}</b>", self.styles['Heading2']))
             story.append(Paragraph(f"Generated: {report_data['generated_at']}", self.styles['Normal']))
             story.append(Spacer(1, 20))
@@ -187,20 +233,17 @@ class DiligenceAgent:
             
             # Key Findings
             story.append(Paragraph("<b>Key Findings</b>", self.styles['Heading2']))
-            for finding in report_data.get('key_findings', []):
-                story.append(Paragraph(f"• {finding}", self.styles['Normal']))
+            story.append(self._bullet_list(report_data.get('key_findings', [])))
             story.append(Spacer(1, 15))
-            
+
             # Risks
             story.append(Paragraph("<b>Key Risks</b>", self.styles['Heading2']))
-            for risk in report_data.get('risks', []):
-                story.append(Paragraph(f"• {risk}", self.styles['Normal']))
+            story.append(self._bullet_list(report_data.get('risks', [])))
             story.append(Spacer(1, 15))
-            
+
             # Opportunities
             story.append(Paragraph("<b>Opportunities</b>", self.styles['Heading2']))
-            for opp in report_data.get('opportunities', []):
-                story.append(Paragraph(f"• {opp}", self.styles['Normal']))
+            story.append(self._bullet_list(report_data.get('opportunities', [])))
             story.append(Spacer(1, 15))
             
             # Scoring Table (if available)
@@ -216,7 +259,7 @@ class DiligenceAgent:
                     ['Overall Score', f"<b>{scoring.get('overall_score', 'N/A')}</b>"]
                 ]
                 
-                table = Table(score_data)
+                table = LongTable(score_data)
                 table.setStyle(TableStyle([
                     ('BACKGROUND', (0, 0), (-1, 0), '#4472C4'),
                     ('TEXTCOLOR', (0, 0), (-1, 0), '#FFFFFF'),
@@ -232,11 +275,12 @@ class DiligenceAgent:
             
             # Next Steps
             story.append(Paragraph("<b>Next Steps</b>", self.styles['Heading2']))
-            for step in report_data.get('next_steps', []):
-                story.append(Paragraph(f"• {step}", self.styles['Normal']))
+            story.append(self._bullet_list(report_data.get('next_steps', [])))
             
-            # Build PDF
-            doc.build(story)
+            # Build PDF in a worker thread - ReportLab is CPU-bound and would
+            # otherwise stall every other in-flight request
+            await asyncio.to_thread(doc.build, story)
+            os.replace(tmp_path, filename)
             return filename
             
         except Exception as e:
@@ -1,15 +1,127 @@
 import os
 import asyncio
-import requests
-from bs4 import BeautifulSoup
-from openai import AsyncOpenAI
+import hashlib
+import httpx
+from bs4 import BeautifulSoup, SoupStrainer
 from typing import Dict, Any
 import json
 
+from utils.llm_cache import cached_chat
+from utils.openai_client import shared_openai
+
+# Only materialize the tags we actually read - keeps parse time and memory
+# flat even for large marketing pages
+_SCRAPE_STRAINER = SoupStrainer(['title', 'meta', 'p', 'section', 'div', 'main'])
+
+# On-disk cache for conditional GETs - re-scrapes of the same homepage
+# revalidate with ETag/Last-Modified instead of re-pulling the full body
+_HTTP_CACHE_DIR = '.cache/http'
+
+_ABOUT_SELECTOR = ', '.join([
+    'section[class*="about"]',
+    'div[class*="about"]',
+    '.hero-content',
+    '.hero-text',
+    'main p',
+    '.description'
+])
+
 class ResearchAgent:
     def __init__(self):
-        self.openai_client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-        
+        self.openai_client = shared_openai
+        self._http = None
+
+    def _get_http(self) -> httpx.AsyncClient:
+        """Lazily create the shared HTTP client (needs a running event loop)"""
+        if self._http is None or self._http.is_closed:
+            # http2 must be set on the transport - a custom transport makes
+            # the client-level flag a no-op
+            self._http = httpx.AsyncClient(
+                timeout=10.0,
+                follow_redirects=True,
+                transport=httpx.AsyncHTTPTransport(http2=True, retries=2),
+                headers={
+                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+                }
+            )
+        return self._http
+
+    async def aclose(self):
+        """Close the HTTP client (called on app shutdown)"""
+        if self._http is not None and not self._http.is_closed:
+            await self._http.aclose()
+
+    @staticmethod
+    def _read_cache_meta(meta_path: str) -> Dict[str, Any]:
+        try:
+            with open(meta_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _read_cached_body(body_path: str) -> bytes:
+        with open(body_path, 'rb') as f:
+            return f.read()
+
+    @staticmethod
+    def _drop_cache_meta(meta_path: str):
+        try:
+            os.remove(meta_path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _write_cache_entry(meta_path: str, body_path: str, content: bytes,
+                           etag, last_modified):
+        try:
+            os.makedirs(_HTTP_CACHE_DIR, exist_ok=True)
+            with open(body_path, 'wb') as f:
+                f.write(content)
+            with open(meta_path, 'w') as f:
+                json.dump({'etag': etag, 'last_modified': last_modified}, f)
+        except OSError:
+            pass
+
+    async def _fetch_cached(self, url: str) -> bytes:
+        """Fetch a URL with an on-disk conditional-GET cache.
+
+        Cache reads and writes go through asyncio.to_thread so disk latency
+        never stalls the event loop.
+        """
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        meta_path = os.path.join(_HTTP_CACHE_DIR, f"{key}.json")
+        body_path = os.path.join(_HTTP_CACHE_DIR, f"{key}.body")
+
+        headers = {}
+        meta = await asyncio.to_thread(self._read_cache_meta, meta_path)
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+        response = await self._get_http().get(url, headers=headers)
+
+        if response.status_code == 304:
+            try:
+                return await asyncio.to_thread(self._read_cached_body, body_path)
+            except OSError:
+                # Body file gone but meta survived - drop the stale validators
+                # and refetch the full body instead of failing the scrape
+                await asyncio.to_thread(self._drop_cache_meta, meta_path)
+                response = await self._get_http().get(url)
+
+        content = response.content
+
+        # Only cache bodies the server gave us validators for
+        etag = response.headers.get('etag')
+        last_modified = response.headers.get('last-modified')
+        if etag or last_modified:
+            await asyncio.to_thread(self._write_cache_entry, meta_path,
+                                    body_path, content, etag, last_modified)
+
+        return content
+
     async def research_company(self, company_data) -> Dict[str, Any]:
         """Conduct comprehensive company research"""
         
@@ -25,17 +137,26 @@ class ResearchAgent:
             "social_presence": {}
         }
         
-        # Scrape company website
-        website_data = await self._scrape_website(company_data.website)
+        # Scrape, search and team research are independent - run them concurrently
+        website_data, search_data, team_data = await asyncio.gather(
+            self._scrape_website(company_data.website),
+            self._web_search(company_data.company_name),
+            self._research_team(company_data.company_name),
+            return_exceptions=True
+        )
+
+        # Each task already returns {"error": ...} on failure, but guard against
+        # anything gather surfaced as a raw exception
+        if isinstance(website_data, Exception):
+            website_data = {"error": str(website_data), "url": company_data.website}
+        if isinstance(search_data, Exception):
+            search_data = {"error": str(search_data)}
+        if isinstance(team_data, Exception):
+            team_data = {"error": str(team_data)}
+
         research_results["basic_info"] = website_data
-        
-        # Search for additional information
-        search_data = await self._web_search(company_data.company_name)
         research_results["news_mentions"] = search_data.get("news", [])
         research_results["market_info"] = search_data.get("market", {})
-        
-        # Get team information
-        team_data = await self._research_team(company_data.company_name)
         research_results["team_info"] = team_data
         
         return research_results
@@ -43,54 +164,48 @@ class ResearchAgent:
     async def _scrape_website(self, url: str) -> Dict[str, Any]:
         """Scrape company website for basic information"""
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extract key information
-            title = soup.find('title')
-            meta_description = soup.find('meta', attrs={'name': 'description'})
-            
-            # Find about section
-            about_text = self._extract_about_section(soup)
-            
-            return {
-                "title": title.text.strip() if title else "",
-                "description": meta_description.get('content', '') if meta_description else "",
-                "about": about_text,
-                "url": url
-            }
-            
+            content = await self._fetch_cached(url)
+
+            # Parsing is pure CPU work - run it in a worker thread so a big
+            # page doesn't freeze every other in-flight request
+            return await asyncio.to_thread(self._parse_website, content, url)
+
         except Exception as e:
             return {"error": str(e), "url": url}
+
+    def _parse_website(self, content: bytes, url: str) -> Dict[str, Any]:
+        """Parse scraped HTML into the basic-info dict (runs off-loop)"""
+        soup = BeautifulSoup(content, 'lxml', parse_only=_SCRAPE_STRAINER)
+
+        # Extract key information
+        title = soup.find('title')
+        meta_description = soup.find('meta', attrs={'name': 'description'})
+
+        # Find about section
+        about_text = self._extract_about_section(soup)
+
+        return {
+            "title": title.text.strip() if title else "",
+            "description": meta_description.get('content', '') if meta_description else "",
+            "about": about_text,
+            "url": url
+        }
     
     def _extract_about_section(self, soup) -> str:
         """Extract about/description text from website"""
-        about_selectors = [
-            'section[class*="about"]',
-            'div[class*="about"]',
-            '.hero-content',
-            '.hero-text',
-            'main p',
-            '.description'
-        ]
-        
-        for selector in about_selectors:
-            elements = soup.select(selector)
-            if elements:
-                text = ' '.join([elem.get_text().strip() for elem in elements[:3]])
-                if len(text) > 50:
-                    return text[:1000]
-        
+        # Single combined selector pass instead of six separate tree walks
+        elements = soup.select(_ABOUT_SELECTOR, limit=3)
+        if elements:
+            text = ' '.join([elem.get_text().strip() for elem in elements])
+            if len(text) > 50:
+                return text[:1000]
+
         # Fallback: get first few paragraphs
-        paragraphs = soup.find_all('p')
+        paragraphs = soup.find_all('p', limit=5)
         if paragraphs:
-            text = ' '.join([p.get_text().strip() for p in paragraphs[:5]])
+            text = ' '.join([p.get_text().strip() for p in paragraphs])
             return text[:1000]
-        
+
         return ""
     
     async def _web_search(self, company_name: str) -> Dict[str, Any]:
@@ -107,21 +222,23 @@ class ResearchAgent:
             Format as JSON with keys: news, market, funding, partnerships
             """
             
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4",
+            content = await cached_chat(
+                self.openai_client,
+                model="gpt-4-1106-preview",
                 messages=[{"role": "user", "content": prompt}],
-                temperature=0.1
+                temperature=0.1,
+                response_format={"type": "json_object"}
             )
-            
+
             # Parse JSON response
             try:
-                return json.loads(response.choices[0].message.content)
+                return json.loads(content)
             except:
-                return {"summary": response.choices[0].message.content}
-                
+                return {"summary": content}
+
         except Exception as e:
             return {"error": str(e)}
-    
+
     async def _research_team(self, company_name: str) -> Dict[str, Any]:
         """Research company team and founders"""
         try:
@@ -136,16 +253,18 @@ class ResearchAgent:
             Format as JSON with founder details.
             """
             
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4",
+            content = await cached_chat(
+                self.openai_client,
+                model="gpt-4-1106-preview",
                 messages=[{"role": "user", "content": prompt}],
-                temperature=0.1
+                temperature=0.1,
+                response_format={"type": "json_object"}
             )
-            
+
             try:
-                return json.loads(response.choices[0].message.content)
+                return json.loads(content)
             except:
-                return {"summary": response.choices[0].message.content}
+                return {"summary": content}
                 
         except Exception as e:
             return {"error": str(e)}
\ No newline at end of file
@@ -1,20 +1,46 @@
-import os
-from openai import AsyncOpenAI
+import re
 from typing import Dict, Any
 import json
 
+from utils.llm_cache import cached_chat
+from utils.openai_client import shared_openai
+
+# Compiled once - one pass over the analysis text instead of one scan per keyword
+_CATEGORY_RE = re.compile(r"\b(DeFi|NFT|DAO|Infrastructure|GameFi|Social|Trading)\b", re.IGNORECASE)
+_CATEGORY_NAMES = {"defi": "DeFi", "nft": "NFT", "dao": "DAO", "infrastructure": "Infrastructure",
+                   "gamefi": "GameFi", "social": "Social", "trading": "Trading"}
+
+_RECOMMENDATION_RE = re.compile(r"strong buy|highly recommend|avoid|pass|high risk", re.IGNORECASE)
+_RECOMMENDATION_MAP = {"strong buy": "Go", "highly recommend": "Go",
+                       "avoid": "No-Go", "pass": "No-Go", "high risk": "No-Go"}
+
 class Web3Agent:
+    # Framework text is static - read it from disk once per process
+    _framework_cache = None
+
     def __init__(self):
-        self.openai_client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self.openai_client = shared_openai
         self.framework = self._load_web3_framework()
-    
+        # Build the system message once; keeping the framework in a stable
+        # prefix also lets OpenAI's server-side prompt caching kick in
+        self._system_msg = {
+            "role": "system",
+            "content": (
+                "You are a Web3 investment analyst for Gain Ventures. "
+                "Analyze companies using the following investment framework:\n\n"
+                f"{self.framework}"
+            )
+        }
+
     def _load_web3_framework(self) -> str:
-        """Load the Web3 investment framework"""
-        try:
-            with open('templates/web3_framework.txt', 'r') as f:
-                return f.read()
-        except FileNotFoundError:
-            return self._default_framework()
+        """Load the Web3 investment framework (cached across instances)"""
+        if Web3Agent._framework_cache is None:
+            try:
+                with open('templates/web3_framework.txt', 'r') as f:
+                    Web3Agent._framework_cache = f.read()
+            except FileNotFoundError:
+                Web3Agent._framework_cache = self._default_framework()
+        return Web3Agent._framework_cache
     
     def _default_framework(self) -> str:
         """Default Web3 framework if file not found"""
@@ -29,10 +55,8 @@ class Web3Agent:
         """Analyze company through Web3 investment lens"""
         
         analysis_prompt = f"""
-        As a Web3 investment analyst, analyze this company using the following framework:
-        
-        {self.framework}
-        
+        Analyze this company through our Web3 investment framework:
+
         Company Information:
         - Name: {company_data.company_name}
         - Website: {company_data.website}
@@ -40,7 +64,7 @@ class Web3Agent:
         - Description: {company_data.description}
         
         Research Data:
-        {json.dumps(research_data, indent=2)}
+        {json.dumps(research_data, separators=(",", ":"))}
         
         Provide a comprehensive Web3-focused analysis including:
         1. **Web3 Category Classification**: Which focus area does this fit?
@@ -55,15 +79,15 @@ class Web3Agent:
         """
         
         try:
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": analysis_prompt}],
+            analysis_text = await cached_chat(
+                self.openai_client,
+                model="gpt-4-1106-preview",
+                messages=[self._system_msg, {"role": "user", "content": analysis_prompt}],
                 temperature=0.2,
-                max_tokens=2000
+                max_tokens=2000,
+                response_format={"type": "json_object"}
             )
             
-            analysis_text = response.choices[0].message.content
-            
             # Try to parse as JSON, fallback to structured text
             try:
                 analysis_json = json.loads(analysis_text)
@@ -74,11 +98,8 @@ class Web3Agent:
                     "recommendation": self._extract_recommendation(analysis_text)
                 }
             
-            # Add framework scoring
-            analysis_json["framework_score"] = await self._score_against_framework(
-                company_data, research_data, analysis_json
-            )
-            
+            # Framework scoring now happens inside the diligence agent's
+            # combined analysis call; no separate GPT-4 round-trip here
             return analysis_json
             
         except Exception as e:
@@ -86,57 +107,10 @@ class Web3Agent:
     
     def _extract_category(self, analysis_text: str) -> str:
         """Extract Web3 category from analysis"""
-        categories = ["DeFi", "NFT", "DAO", "Infrastructure", "GameFi", "Social", "Trading"]
-        for category in categories:
-            if category.lower() in analysis_text.lower():
-                return category
-        return "Other"
-    
+        match = _CATEGORY_RE.search(analysis_text)
+        return _CATEGORY_NAMES[match.group(1).lower()] if match else "Other"
+
     def _extract_recommendation(self, analysis_text: str) -> str:
         """Extract investment recommendation"""
-        text_lower = analysis_text.lower()
-        if "strong buy" in text_lower or "highly recommend" in text_lower:
-            return "Go"
-        elif "avoid" in text_lower or "pass" in text_lower or "high risk" in text_lower:
-            return "No-Go"
-        else:
-            return "Monitor"
-    
-    async def _score_against_framework(self, company_data, research_data: Dict[str, Any], analysis: Dict[str, Any]) -> Dict[str, Any]:
-        """Score the company against Web3 framework criteria"""
-        
-        scoring_prompt = f"""
-        Score this Web3 company against our investment framework on a scale of 1-10:
-        
-        Company: {company_data.company_name}
-        Analysis: {json.dumps(analysis, indent=2)}
-        
-        Score these areas (1-10):
-        1. Team Quality & Experience
-        2. Technology Innovation
-        3. Market Opportunity Size
-        4. Tokenomics & Business Model
-        5. Traction & Community
-        6. Regulatory Risk (10 = low risk)
-        7. Competitive Position
-        8. Investment Fit (our thesis alignment)
-        
-        Provide scores as JSON: {{"team_score": X, "tech_score": X, ...}}
-        Also include overall_score (average) and investment_recommendation ("Go", "No-Go", "Monitor")
-        """
-        
-        try:
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": scoring_prompt}],
-                temperature=0.1
-            )
-            
-            return json.loads(response.choices[0].message.content)
-            
-        except Exception as e:
-            return {
-                "error": str(e),
-                "overall_score": 5.0,
-                "investment_recommendation": "Monitor"
-            }
\ No newline at end of file
+        match = _RECOMMENDATION_RE.search(analysis_text)
+        return _RECOMMENDATION_MAP[match.group(0).lower()] if match else "Monitor"
@@ -32,13 +32,24 @@ research_agent = ResearchAgent()
 web3_agent = Web3Agent()
 diligence_agent = DiligenceAgent()
 
+# External IDs with a run currently in flight - Airtable sometimes fires the
+# webhook twice for the same record, and each duplicate run is paid GPT-4 spend
+_active_runs = set()
+
 @app.post("/research/company")
 async def trigger_research(company: CompanyData, background_tasks: BackgroundTasks):
     """Trigger AI research for a company"""
-    
+
+    if company.external_id in _active_runs:
+        return {
+            "message": f"Research already in progress for {company.company_name}",
+            "external_id": company.external_id,
+            "status": "duplicate"
+        }
+
     # Add background task for processing
     background_tasks.add_task(process_company_research, company)
-    
+
     return {
         "message": f"Research started for {company.company_name}",
         "external_id": company.external_id,
@@ -47,17 +58,29 @@ async def trigger_research(company: CompanyData, background_tasks: BackgroundTas
 
 async def process_company_research(company: CompanyData):
     """Background task to process company research"""
-    
+
+    # Re-check under the task itself: two webhook fires can both pass the
+    # endpoint check before either task starts
+    if company.external_id in _active_runs:
+        print(f"Skipping duplicate run for {company.company_name}")
+        return
+    _active_runs.add(company.external_id)
+
+    # One timestamp per run - keeps the Airtable fields consistent and avoids
+    # re-formatting the same wall-clock reading in every update
+    now_str = datetime.now().strftime("%m/%d/%Y, %I:%M %p")
+
     try:
         print(f"Starting research for {company.company_name}")
         
-        # Step 1: Update status in Airtable
-        await airtable.update_record(company.external_id, {
+        # Step 1: Queue the status update - the batched flusher delivers it in
+        # the background while research runs
+        airtable.queue_update(company.external_id, {
             "Stage": "Initial Research",
             "Diligence Status": "In Progress",
-            "Last Updated": datetime.now().strftime("%m/%d/%Y, %I:%M %p")
+            "Last Updated": now_str
         })
-        
+
         # Step 2: General company research
         print("Conducting company research...")
         research_data = await research_agent.research_company(company)
@@ -72,23 +95,29 @@ async def process_company_research(company: CompanyData):
             company, research_data, web3_analysis
         )
         
-        # Step 5: Update Airtable with results
-        print("Updating Airtable...")
-        await airtable.update_record(company.external_id, {
+        # Steps 5+6: Final Airtable update and the partner email only need the
+        # finished report - run them concurrently, and don't let one failure
+        # abort the other
+        print("Updating Airtable and sending email report...")
+        airtable.queue_update(company.external_id, {
             "Stage": "Partner Review",
-            "Diligence Status": "Complete", 
+            "Diligence Status": "Complete",
             "AI Recommendation": diligence_report.get("investment_recommendation", "Monitor"),
-            "Last Updated": datetime.now().strftime("%m/%d/%Y, %I:%M %p")
+            "Last Updated": now_str
         })
-        
-        # Step 6: Send email to partners
-        print("Sending email report...")
-        await email_client.send_diligence_report(
-            company.company_name,
-            diligence_report.get("pdf_path", ""),
-            diligence_report.get("executive_summary", "Summary not available")
+        results = await asyncio.gather(
+            airtable.flush(),
+            email_client.send_diligence_report(
+                company.company_name,
+                diligence_report.get("pdf_path", ""),
+                diligence_report.get("executive_summary", "Summary not available")
+            ),
+            return_exceptions=True
         )
-        
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"Finalization step failed: {str(result)}")
+
         print(f"Successfully completed research for {company.company_name}")
         
     except Exception as e:
@@ -96,15 +125,34 @@ async def process_company_research(company: CompanyData):
         
         # Update Airtable with error status
         try:
-            await airtable.update_record(company.external_id, {
+            airtable.queue_update(company.external_id, {
                 "Stage": "New Lead",
                 "Diligence Status": "Failed",
                 "AI Recommendation": "Error - Review Manually",
-                "Last Updated": datetime.now().strftime("%m/%d/%Y, %I:%M %p")
+                "Last Updated": now_str
             })
+            await airtable.flush()
         except:
             print("Failed to update error status in Airtable")
 
+    finally:
+        _active_runs.discard(company.external_id)
+
+@app.on_event("startup")
+async def startup_event():
+    """Size the default thread pool for concurrent diligence runs"""
+    from concurrent.futures import ThreadPoolExecutor
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=8))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close shared client connections"""
+    from utils.openai_client import close_openai
+    await research_agent.aclose()
+    await airtable.aclose()
+    await close_openai()
+    await email_client.aclose()
+
 @app.get("/")
 async def root():
     return {
@@ -1,34 +1,192 @@
 import os
-import requests
+import asyncio
+import httpx
+import orjson
 from typing import Dict, Any, Optional
-import json
+
+from cachetools import TTLCache
+
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+
+from utils.circuit_breaker import CircuitBreaker
+
+# How long a cached external_id -> record_id mapping stays trusted
+_ID_CACHE_TTL = 300
+
+# Airtable allows 5 requests/sec/base - self-throttle rather than eat 429s
+_airtable_semaphore = asyncio.Semaphore(5)
 
 class AirtableClient:
     def __init__(self):
         self.api_key = os.getenv('AIRTABLE_API_KEY')
+        if not self.api_key:
+            raise RuntimeError("AIRTABLE_API_KEY must be set")
         self.base_id = os.getenv('AIRTABLE_BASE_ID', 'appxrSHAyyydQq6XY')
         self.table_id = os.getenv('AIRTABLE_TABLE_ID', 'tblyW2riQUpHA2da8')
         self.base_url = f"https://api.airtable.com/v0/{self.base_id}/{self.table_id}"
         
         self.headers = {
             'Authorization': f'Bearer {self.api_key}',
-            'Content-Type': 'application/json'
+            'Content-Type': 'application/json',
+            # Record listings are tens of KB of repetitive JSON - compression
+            # cuts that ~8x and httpx inflates transparently
+            'Accept-Encoding': 'gzip, br'
         }
-    
+
+        # One long-lived client with keep-alive - a fresh TLS handshake per
+        # call was the dominant latency cost on every Airtable round-trip
+        self._client = httpx.AsyncClient(
+            headers=self.headers,
+            http2=True,
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+
+        # Updates queued for batched delivery (Airtable accepts 10 per PATCH)
+        self._pending_updates = []
+        self._flush_task = None
+
+        # Single-record writes awaiting a shared batched request
+        self._pending_writes = []
+        self._write_task = None
+
+        # external_id -> record_id; record ids are stable, so a short TTL
+        # collapses the lookup GET that preceded every update, and the size
+        # bound keeps a long-running process from growing without limit
+        self._id_cache = TTLCache(maxsize=4096, ttl=_ID_CACHE_TTL)
+
+        # Fail fast during an Airtable outage instead of stacking 30s
+        # timeouts times five retries on every caller
+        self._breaker = CircuitBreaker('airtable')
+
+    async def aclose(self):
+        """Close the HTTP client (called on app shutdown)"""
+        await self._client.aclose()
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Issue one request through the circuit breaker"""
+        return await self._breaker.call(self._request_with_retry, method, url, **kwargs)
+
+    @retry(retry=retry_if_exception_type(httpx.HTTPStatusError),
+           wait=wait_exponential_jitter(initial=0.25, max=8),
+           stop=stop_after_attempt(5),
+           reraise=True)
+    async def _request_with_retry(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Issue one request, retrying transient 429/5xx with backoff.
+
+        Other status codes are returned as-is so call sites keep their own
+        raise_for_status semantics without triggering retries.
+        """
+        async with _airtable_semaphore:
+            response = await self._client.request(method, url, **kwargs)
+
+        if response.status_code == 429:
+            # Honor Airtable's cool-down before tenacity retries the call
+            await asyncio.sleep(float(response.headers.get('Retry-After', '1')))
+            response.raise_for_status()
+        elif response.status_code >= 500:
+            response.raise_for_status()
+
+        return response
+
+    def queue_update(self, external_id: str, fields: Dict[str, Any]):
+        """Queue an update for batched background delivery"""
+        self._pending_updates.append((external_id, fields))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._flush_loop())
+
+    async def _flush_loop(self):
+        """Debounce queued updates so several ride one request"""
+        while self._pending_updates:
+            await asyncio.sleep(0.2)
+            await self.flush()
+
+    async def flush(self):
+        """Flush queued status updates through the write batcher"""
+        pending = self._pending_updates
+        self._pending_updates = []
+
+        writes = []
+        for external_id, fields in pending:
+            record_id = await self._get_record_id(external_id)
+            if not record_id:
+                print(f"Record not found for external ID: {external_id}")
+                continue
+            writes.append(self._enqueue_write('patch', {'id': record_id, 'fields': fields}))
+
+        results = await asyncio.gather(*writes, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"Error flushing Airtable updates: {str(result)}")
+
+    def _enqueue_write(self, op: str, record: Dict[str, Any]):
+        """Queue one record write; returns a future resolved by the batch"""
+        future = asyncio.get_event_loop().create_future()
+        self._pending_writes.append((op, record, future))
+        if self._write_task is None or self._write_task.done():
+            self._write_task = asyncio.ensure_future(self._drain_writes())
+        return future
+
+    async def _drain_writes(self):
+        """Group queued writes into batched requests (up to 10 records each)"""
+        while self._pending_writes:
+            # Short debounce so near-simultaneous writes share one request
+            await asyncio.sleep(0.05)
+
+            for op in ('patch', 'post'):
+                group = [w for w in self._pending_writes if w[0] == op][:10]
+                if not group:
+                    continue
+                self._pending_writes = [w for w in self._pending_writes if w not in group]
+
+                records = [record for _, record, _ in group]
+                try:
+                    if op == 'patch':
+                        response = await self._request('PATCH', self.base_url,
+                                                       content=orjson.dumps({'records': records}))
+                    else:
+                        response = await self._request('POST', self.base_url,
+                                                       content=orjson.dumps({'records': records}))
+                    response.raise_for_status()
+
+                    # Airtable returns records in request order
+                    returned = orjson.loads(response.content).get('records', [])
+                    for (_, _, future), rec in zip(group, returned):
+                        if not future.done():
+                            future.set_result(rec)
+                    # Never leave a future unresolved - a short response
+                    # would otherwise hang its awaiting caller forever
+                    if len(returned) < len(group):
+                        error = Exception(
+                            f"Airtable returned {len(returned)} records "
+                            f"for a batch of {len(group)}")
+                        for _, _, future in group[len(returned):]:
+                            if not future.done():
+                                future.set_exception(error)
+                except Exception as e:
+                    for _, _, future in group:
+                        if not future.done():
+                            future.set_exception(e)
+
     async def get_record_by_external_id(self, external_id: str) -> Optional[Dict[str, Any]]:
         """Find record by external ID"""
         try:
-            # Use filter formula to find record
-            filter_formula = f"{{External ID}}='{external_id}'"
-            url = f"{self.base_url}?filterByFormula={filter_formula}"
-            
-            response = requests.get(url, headers=self.headers)
+            # Escape single quotes for the formula and let httpx percent-encode
+            # the query string; maxRecords=1 lets Airtable stop scanning early
+            escaped = external_id.replace("'", "''")
+            params = {
+                'filterByFormula': f"{{External ID}}='{escaped}'",
+                'maxRecords': 1
+            }
+
+            response = await self._request('GET', self.base_url, params=params)
             response.raise_for_status()
             
-            data = response.json()
+            data = orjson.loads(response.content)
             records = data.get('records', [])
             
             if records:
+                self._id_cache[external_id] = records[0]['id']
                 return records[0]
             return None
             
@@ -36,27 +194,35 @@ class AirtableClient:
             print(f"Error fetching record: {str(e)}")
             return None
     
+    async def _get_record_id(self, external_id: str) -> Optional[str]:
+        """Resolve external_id to a record id, using the TTL cache if fresh"""
+        record_id = self._id_cache.get(external_id)
+        if record_id:
+            return record_id
+
+        record = await self.get_record_by_external_id(external_id)
+        return record['id'] if record else None
+
     async def update_record(self, external_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
         """Update record by external ID"""
         try:
-            # First find the record
-            record = await self.get_record_by_external_id(external_id)
-            if not record:
+            record_id = await self._get_record_id(external_id)
+            if not record_id:
                 raise Exception(f"Record not found for external ID: {external_id}")
-            
-            record_id = record['id']
-            
-            # Update the record
-            url = f"{self.base_url}/{record_id}"
-            payload = {
-                'fields': fields
-            }
-            
-            response = requests.patch(url, headers=self.headers, json=payload)
-            response.raise_for_status()
-            
-            return response.json()
-            
+
+            try:
+                return await self._enqueue_write('patch', {'id': record_id, 'fields': fields})
+            except httpx.HTTPStatusError as e:
+                # Only a 404/403 suggests a stale cached id - anything else
+                # (5xx, validation errors) would just fail again on retry
+                if e.response.status_code not in (403, 404):
+                    raise
+                self._id_cache.pop(external_id, None)
+                record_id = await self._get_record_id(external_id)
+                if not record_id:
+                    raise Exception(f"Record not found for external ID: {external_id}")
+                return await self._enqueue_write('patch', {'id': record_id, 'fields': fields})
+
         except Exception as e:
             print(f"Error updating record: {str(e)}")
             raise e
@@ -64,31 +230,48 @@ class AirtableClient:
     async def create_record(self, fields: Dict[str, Any]) -> Dict[str, Any]:
         """Create new record"""
         try:
-            payload = {
-                'fields': fields
-            }
-            
-            response = requests.post(self.base_url, headers=self.headers, json=payload)
-            response.raise_for_status()
-            
-            return response.json()
-            
+            return await self._enqueue_write('post', {'fields': fields})
+
         except Exception as e:
             print(f"Error creating record: {str(e)}")
             raise e
     
-    async def get_records_by_status(self, diligence_status: str = "Pending") -> list:
+    async def iter_records_by_status(self, diligence_status: str = "Pending",
+                                     fields: Optional[list] = None):
+        """Stream records with a given status, following Airtable pagination.
+
+        Yields records as each page arrives, so callers can start working
+        before the full queue has been fetched. Pass fields to have Airtable
+        return only the columns you need.
+        """
+        escaped = diligence_status.replace("'", "''")
+        params: Dict[str, Any] = {
+            'filterByFormula': f"{{Diligence Status}}='{escaped}'",
+            'pageSize': 100
+        }
+        if fields:
+            params['fields[]'] = fields
+
+        while True:
+            response = await self._request('GET', self.base_url, params=params)
+            response.raise_for_status()
+
+            data = orjson.loads(response.content)
+            for record in data.get('records', []):
+                yield record
+
+            offset = data.get('offset')
+            if not offset:
+                break
+            params['offset'] = offset
+
+    async def get_records_by_status(self, diligence_status: str = "Pending",
+                                    fields: Optional[list] = None) -> list:
         """Get all records with specific diligence status"""
         try:
-            filter_formula = f"{{Diligence Status}}='{diligence_status}'"
-            url = f"{self.base_url}?filterByFormula={filter_formula}"
-            
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            
-            data = response.json()
-            return data.get('records', [])
-            
+            return [record async for record in
+                    self.iter_records_by_status(diligence_status, fields)]
+
         except Exception as e:
             print(f"Error fetching records: {str(e)}")
             return []
\ No newline at end of file
@@ -0,0 +1,50 @@
+import time
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit is open"""
+
+class CircuitBreaker:
+    """Minimal circuit breaker: fail fast while a backend is clearly down.
+
+    After fail_max consecutive failures the circuit opens and calls raise
+    CircuitOpenError immediately instead of eating connect timeouts. Once
+    reset_timeout has passed, one trial call is let through - success closes
+    the circuit, failure re-opens it.
+    """
+
+    def __init__(self, name: str, fail_max: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+
+    def _before_call(self):
+        if self._opened_at is not None:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                raise CircuitOpenError(
+                    f"{self.name} circuit open - failing fast")
+            # Half-open: let one trial call through; another failure re-opens
+            self._opened_at = None
+            self._failures = self.fail_max - 1
+
+    def _on_success(self):
+        self._failures = 0
+
+    def _on_failure(self):
+        self._failures += 1
+        if self._failures >= self.fail_max:
+            self._opened_at = time.monotonic()
+            print(f"{self.name} circuit opened after "
+                  f"{self._failures} consecutive failures")
+
+    async def call(self, func, *args, **kwargs):
+        """Run an async callable through the breaker"""
+        self._before_call()
+        try:
+            result = await func(*args, **kwargs)
+        except Exception:
+            self._on_failure()
+            raise
+        self._on_success()
+        return result
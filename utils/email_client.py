@@ -1,36 +1,58 @@
 import os
-import smtplib
+import asyncio
+import aiosmtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
-from typing import List, Optional
+from string import Template
+from typing import List, Optional, Tuple
+
+from utils.circuit_breaker import CircuitBreaker
+
+# Recycle the SMTP session periodically rather than reusing it forever
+_MAX_SENDS_PER_CONNECTION = 100
 
 class EmailClient:
     def __init__(self):
-        self.email_user = os.getenv('EMAIL_USER', 'robertpj235@gmail.com')
-        self.email_password = os.getenv('EMAIL_PASSWORD', 'rjiyoya2003')
-        self.company_email = os.getenv('COMPANY_EMAIL', 'robert@gain.ventures')
-        
+        # Credentials come from the environment only - no fallbacks, so a
+        # missing .env fails loudly at startup instead of sending with bad creds
+        self.email_user = os.getenv('EMAIL_USER')
+        self.email_password = os.getenv('EMAIL_PASSWORD')
+        if not self.email_user or not self.email_password:
+            raise RuntimeError("EMAIL_USER and EMAIL_PASSWORD must be set")
+        self.company_email = os.getenv('COMPANY_EMAIL', self.email_user)
+
         # Gmail SMTP configuration
         self.smtp_server = 'smtp.gmail.com'
         self.smtp_port = 587
-    
-    async def send_diligence_report(self, company_name: str, pdf_path: str, summary: str) -> bool:
-        """Send diligence report to partners"""
-        try:
-            # Create message
-            msg = MIMEMultipart()
-            msg['From'] = self.email_user
-            msg['To'] = self.company_email
-            msg['Subject'] = f"AI Diligence Report: {company_name}"
-            
-            # Email body
-            body = f"""
-            New AI diligence report completed for: {company_name}
+
+        # Persistent connection - TLS+AUTH setup dominates per-send cost.
+        # SMTP is one-command-at-a-time at the protocol level, so access is
+        # serialized with an asyncio.Lock
+        self._smtp = None
+        self._smtp_lock = asyncio.Lock()
+        self._send_count = 0
+
+        # Fail fast when Gmail is unreachable - callers already degrade
+        # gracefully on a False return
+        self._breaker = CircuitBreaker('smtp')
+
+        # (pdf_path, mtime, size) -> base64 payload of the last report sent;
+        # re-sends of the same PDF skip the read + transcode entirely
+        self._attachment_cache = {}
+
+        # body -> MIMEText part for the current outreach campaign; batches
+        # send the same templated HTML to every prospect, so encode it once
+        self._body_part_cache = {}
+
+        # Compiled once - substitute() per send beats re-assembling the
+        # f-string body on every report
+        self._report_body_tmpl = Template("""
+            New AI diligence report completed for: $company_name
             
             Executive Summary:
-            {summary[:500]}...
+            $summary_head...
             
             Please review the attached detailed report and provide your decision on whether to proceed with outreach.
             
@@ -38,33 +60,122 @@ class EmailClient:
             
             Best regards,
             Gain Ventures AI System
-            """
+            """)
+
+    async def _get_connection(self) -> aiosmtplib.SMTP:
+        """Return a healthy logged-in SMTP connection, reconnecting if needed"""
+        if self._smtp is not None:
+            if self._send_count >= _MAX_SENDS_PER_CONNECTION:
+                await self._drop_connection()
+            else:
+                try:
+                    await self._smtp.noop()
+                    return self._smtp
+                except Exception:
+                    self._smtp = None
+
+        smtp = aiosmtplib.SMTP(hostname=self.smtp_server, port=self.smtp_port,
+                               start_tls=False)
+        await smtp.connect()
+        await smtp.starttls()
+        await smtp.login(self.email_user, self.email_password)
+        self._smtp = smtp
+        self._send_count = 0
+        return smtp
+
+    async def _drop_connection(self):
+        if self._smtp is not None:
+            try:
+                await self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+
+    async def _send(self, msg: MIMEMultipart, from_addr: str, to_addrs: List[str]):
+        """Send one message through the circuit breaker"""
+        await self._breaker.call(self._send_locked, msg, from_addr, to_addrs)
+
+    async def _send_locked(self, msg: MIMEMultipart, from_addr: str, to_addrs: List[str]):
+        """Send over the persistent connection, RSET between messages.
+
+        send_message serializes the MIME tree straight onto the wire and
+        pipelines MAIL FROM/RCPT TO/DATA where the server supports it, so
+        there's no as_string() round-trip and fewer network turnarounds.
+        """
+        async with self._smtp_lock:
+            try:
+                smtp = await self._get_connection()
+                await smtp.send_message(msg, sender=from_addr, recipients=to_addrs)
+            except aiosmtplib.SMTPServerDisconnected:
+                # Connection went stale mid-send - reconnect once and resend
+                self._smtp = None
+                smtp = await self._get_connection()
+                await smtp.send_message(msg, sender=from_addr, recipients=to_addrs)
+
+            self._send_count += 1
+            try:
+                await smtp.rset()
+            except Exception:
+                self._smtp = None
+
+    async def aclose(self):
+        """Quit the persistent SMTP connection (called on shutdown)"""
+        async with self._smtp_lock:
+            await self._drop_connection()
+
+    def _build_attachment(self, pdf_path: str) -> Optional[MIMEBase]:
+        """Build the PDF attachment part, caching the base64 transcode"""
+        try:
+            st = os.stat(pdf_path)
+        except OSError:
+            return None
+
+        key = (pdf_path, st.st_mtime, st.st_size)
+        encoded = self._attachment_cache.get(key)
+
+        part = MIMEBase('application', 'octet-stream')
+        if encoded is None:
+            with open(pdf_path, "rb") as attachment:
+                part.set_payload(attachment.read())
+            encoders.encode_base64(part)
+            # Only keep the latest report - that's the one sent repeatedly
+            self._attachment_cache = {key: part.get_payload()}
+        else:
+            part.set_payload(encoded)
+            part.add_header('Content-Transfer-Encoding', 'base64')
+
+        part.add_header(
+            'Content-Disposition',
+            f'attachment; filename= {os.path.basename(pdf_path)}'
+        )
+        return part
+
+    async def send_diligence_report(self, company_name: str, pdf_path: str, summary: str) -> bool:
+        """Send diligence report to partners"""
+        try:
+            # Create message
+            msg = MIMEMultipart()
+            msg['From'] = self.email_user
+            msg['To'] = self.company_email
+            msg['Subject'] = f"AI Diligence Report: {company_name}"
             
+            # Email body
+            body = self._report_body_tmpl.substitute(
+                company_name=company_name, summary_head=summary[:500])
+
             msg.attach(MIMEText(body, 'plain'))
             
-            # Attach PDF if it exists
-            if pdf_path and os.path.exists(pdf_path):
-                with open(pdf_path, "rb") as attachment:
-                    part = MIMEBase('application', 'octet-stream')
-                    part.set_payload(attachment.read())
-                
-                encoders.encode_base64(part)
-                part.add_header(
-                    'Content-Disposition',
-                    f'attachment; filename= {os.path.basename(pdf_path)}'
-                )
+            # Attach PDF if it exists; the read + base64 transcode runs in a
+            # worker thread so large attachments don't stall the event loop
+            part = await asyncio.to_thread(self._build_attachment, pdf_path) if pdf_path else None
+            if part is not None:
                 msg.attach(part)
             
             # Send email
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.email_user, self.email_password)
-            text = msg.as_string()
-            server.sendmail(self.email_user, self.company_email, text)
-            server.quit()
-            
+            await self._send(msg, self.email_user, [self.company_email])
+
             return True
-            
+
         except Exception as e:
             print(f"Error sending email: {str(e)}")
             return False
@@ -81,17 +192,18 @@ class EmailClient:
                 msg['Cc'] = ', '.join(cc_emails)
             
             msg['Subject'] = subject
-            msg.attach(MIMEText(body, 'html'))
-            
+
+            # Attaching doesn't mutate the part, so identical campaign bodies
+            # can share one encoded MIMEText; keep only the latest body
+            part = self._body_part_cache.get(body)
+            if part is None:
+                part = MIMEText(body, 'html')
+                self._body_part_cache = {body: part}
+            msg.attach(part)
+
             # Send email
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.email_user, self.email_password)
-            
             recipients = [company_email] + (cc_emails or [])
-            text = msg.as_string()
-            server.sendmail(self.company_email, recipients, text)
-            server.quit()
+            await self._send(msg, self.company_email, recipients)
             
             return True
             
@@ -99,6 +211,22 @@ class EmailClient:
             print(f"Error sending outreach email: {str(e)}")
             return False
     
+    async def send_outreach_batch(self, items: List[Tuple], max_concurrency: int = 10) -> List:
+        """Send outreach emails to many prospects concurrently.
+
+        Each item is (company_email, subject, body) or
+        (company_email, subject, body, cc_emails). Failures come back in the
+        result list instead of aborting the batch.
+        """
+        sem = asyncio.Semaphore(max_concurrency)
+
+        async def _one(item):
+            async with sem:
+                return await self.send_outreach_email(*item)
+
+        return await asyncio.gather(*[_one(item) for item in items],
+                                    return_exceptions=True)
+
     async def send_notification(self, subject: str, message: str, to_email: str = None) -> bool:
         """Send general notification email"""
         try:
@@ -112,12 +240,7 @@ class EmailClient:
             msg.attach(MIMEText(message, 'plain'))
             
             # Send email
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.email_user, self.email_password)
-            text = msg.as_string()
-            server.sendmail(self.email_user, recipient, text)
-            server.quit()
+            await self._send(msg, self.email_user, [recipient])
             
             return True
             
@@ -0,0 +1,82 @@
+import hashlib
+import json
+from typing import Dict, List, Optional
+
+from cachetools import TTLCache
+
+from utils.openai_pool import throttled_create
+
+class LLMCache:
+    """In-process cache for deterministic (low temperature) LLM responses"""
+
+    def __init__(self, ttl: int = 86400, max_temperature: float = 0.2,
+                 maxsize: int = 512):
+        self.max_temperature = max_temperature
+        # Completions are multi-KB strings, so the size bound matters as much
+        # as the TTL in a long-running process; TTLCache evicts both expired
+        # and excess entries instead of growing forever
+        self._store = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def make_key(self, model: str, messages: List[Dict[str, str]], temperature: float) -> str:
+        """Stable cache key over the request parameters"""
+        payload = json.dumps({
+            "model": model,
+            "messages": messages,
+            "temperature": temperature
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        return self._store.get(key)
+
+    def set(self, key: str, value: str):
+        self._store[key] = value
+
+# Shared cache instance for all agents
+llm_cache = LLMCache()
+
+async def cached_chat(client, model: str, messages: List[Dict[str, str]],
+                      temperature: float, max_tokens: int = None,
+                      stream: bool = False, **kwargs) -> str:
+    """Run a chat completion, caching responses for low-temperature prompts.
+
+    Returns the message content string. Responses are only cached when
+    temperature is at or below the cache threshold (0.2), since higher
+    temperatures are intentionally non-deterministic. With stream=True the
+    completion is consumed incrementally as tokens arrive, which frees the
+    request slot as soon as the call is accepted.
+    """
+    cacheable = temperature <= llm_cache.max_temperature
+
+    key = None
+    if cacheable:
+        key = llm_cache.make_key(model, messages, temperature)
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return cached
+
+    params = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature
+    }
+    if max_tokens is not None:
+        params["max_tokens"] = max_tokens
+    params.update(kwargs)
+
+    if stream:
+        params["stream"] = True
+        response = await throttled_create(client, **params)
+        parts = []
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+        content = "".join(parts)
+    else:
+        response = await throttled_create(client, **params)
+        content = response.choices[0].message.content
+
+    if cacheable:
+        llm_cache.set(key, content)
+
+    return content
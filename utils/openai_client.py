@@ -0,0 +1,24 @@
+import os
+
+import httpx
+from dotenv import load_dotenv
+from openai import AsyncOpenAI
+
+# This module is imported (via the agents) before main.py reaches its own
+# load_dotenv() call, so pull in .env here or AsyncOpenAI raises at import
+# when the key only lives there
+load_dotenv()
+
+# One client (and one httpx connection pool) shared by every agent, so TLS
+# handshakes and keep-alive sockets are amortized across all LLM calls
+shared_openai = AsyncOpenAI(
+    api_key=os.getenv('OPENAI_API_KEY'),
+    http_client=httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        timeout=httpx.Timeout(60.0)
+    )
+)
+
+async def close_openai():
+    """Close the shared client (called on app shutdown)"""
+    await shared_openai.close()
@@ -0,0 +1,50 @@
+import asyncio
+import os
+import time
+
+from openai import RateLimitError, APITimeoutError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+
+# Caps tuned for the current OpenAI tier; override via env without a deploy
+MAX_CONCURRENCY = int(os.getenv('OPENAI_MAX_CONCURRENCY', '20'))
+REQUESTS_PER_MINUTE = int(os.getenv('OPENAI_RPM', '500'))
+
+class RateLimiter:
+    """Async token bucket capping requests per minute"""
+
+    def __init__(self, rpm: int):
+        self.rpm = rpm
+        self._tokens = float(rpm)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                refill = (now - self._updated) * (self.rpm / 60.0)
+                self._tokens = min(float(self.rpm), self._tokens + refill)
+                self._updated = now
+
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+
+                # Sleep just long enough for the next token to accrue
+                await asyncio.sleep((1.0 - self._tokens) / (self.rpm / 60.0))
+
+# Shared across all agents so the whole process respects one budget
+openai_semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+rate_limiter = RateLimiter(REQUESTS_PER_MINUTE)
+
+@retry(
+    stop=stop_after_attempt(5),
+    wait=wait_exponential_jitter(1, 30),
+    retry=retry_if_exception_type((RateLimitError, APITimeoutError)),
+    reraise=True
+)
+async def throttled_create(client, **params):
+    """chat.completions.create guarded by concurrency, RPM and retry limits"""
+    async with openai_semaphore:
+        await rate_limiter.acquire()
+        return await client.chat.completions.create(**params)